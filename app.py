@@ -1,38 +1,43 @@
 # app.py
 import os
+import re
 import json
 import io
+import csv
+import shutil
 from pathlib import Path
 from datetime import datetime
 import uuid
-import pandas as pd
+import hashlib
+import threading
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 from dotenv import load_dotenv
 
-# Optional external services — safe to comment if not present
+# Optional external services — provider clients are imported inside the renderer that needs them
 try:
-    from services.providers import SponsorUnitedClient, DigiDeckClient, SalesforceClient, DynamicsClient, TableauClient  # noqa
-except Exception:
-    SponsorUnitedClient = DigiDeckClient = SalesforceClient = DynamicsClient = TableauClient = None  # stubs
-
-try:
-    from services.reasoning import propose_for_prospect, TEAM_ASSETS  # noqa
-except Exception:
-    def propose_for_prospect(_): return {"opener": "", "rationale": "", "matching_assets": [], "next_steps": []}
-    TEAM_ASSETS = ["LED ribbon", "Social post", "Player appearance"]
-
-try:
-    from services.storage import build_contract_store  # noqa
-except Exception:
-    def build_contract_store(*_, **__): return (None, 0, "chroma")
-
-try:
-    from services.s3store import s3_enabled, upload_bytes, presigned_url, download_bytes  # noqa
+    from services.s3store import (  # noqa
+        s3_enabled, upload_bytes, upload_fileobj, presigned_url, download_bytes, last_modified)
 except Exception:
     def s3_enabled(): return False
     def upload_bytes(*_, **__): return False
+    def upload_fileobj(*_, **__): return False
     def presigned_url(*_, **__): return None
     def download_bytes(*_, **__): return None
+    def last_modified(*_, **__): return None
+
+# Fast JSON (orjson) when available; stdlib otherwise. Both emit/accept UTF-8 bytes.
+try:
+    import orjson
+    def json_dumps(data, indent: bool = False) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(data, indent: bool = False) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+    json_loads = json.loads
 
 load_dotenv()
 
@@ -43,63 +48,69 @@ ASSETS = Path(__file__).parent / "assets"
 FAVICON = ASSETS / "favicon.png"        # tab icon
 HEADER_LOGO = ASSETS / "SSAM_Logo.png"  # page header logo
 
+@lru_cache(maxsize=1)
+def _favicon() -> str:
+    """Favicon path, or an emoji fallback; the stat runs once per process."""
+    return str(FAVICON) if FAVICON.exists() else "🏟️"
+
 st.set_page_config(
     page_title="Sponsorship Sales & Activation Machine",
-    page_icon=str(FAVICON) if FAVICON.exists() else "🏟️",
+    page_icon=_favicon(),
     layout="wide",
 )
 
-def apply_theme():
-    theme = st.session_state.get("ui_theme", "dark")
-    ACCENT = "#16A34A"  # green
-    TAB = ACCENT
-
-    if theme == "dark":
-        st.markdown(f"""
+# Theme CSS, pre-rendered (accent / active-tab color #16A34A green)
+_THEME_CSS = {
+    "dark": """
         <style>
-        .stApp {{ background:#0E1117; color:#FAFAFA; }}
-        section[data-testid="stSidebar"] {{ background:#161A23; }}
-        div[role="tablist"] button[aria-selected="true"] {{ border-bottom:2px solid {TAB}; }}
+        .stApp { background:#0E1117; color:#FAFAFA; }
+        section[data-testid="stSidebar"] { background:#161A23; }
+        div[role="tablist"] button[aria-selected="true"] { border-bottom:2px solid #16A34A; }
 
         /* Make all buttons green */
         .stButton>button,
         .stDownloadButton>button,
-        .stFormSubmitButton>button {{
-            background:{ACCENT}; color:#0E1117; border:0;
-        }}
+        .stFormSubmitButton>button {
+            background:#16A34A; color:#0E1117; border:0;
+        }
         .stButton>button:hover,
         .stDownloadButton>button:hover,
-        .stFormSubmitButton>button:hover {{
+        .stFormSubmitButton>button:hover {
             filter:brightness(1.05);
-        }}
+        }
         </style>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
+        """,
+    "light": """
         <style>
-        div[role="tablist"] button[aria-selected="true"] {{ border-bottom:2px solid {TAB}; }}
+        div[role="tablist"] button[aria-selected="true"] { border-bottom:2px solid #16A34A; }
 
         .stButton>button,
         .stDownloadButton>button,
-        .stFormSubmitButton>button {{
-            background:{ACCENT}; color:white; border:0;
-        }}
+        .stFormSubmitButton>button {
+            background:#16A34A; color:white; border:0;
+        }
         .stButton>button:hover,
         .stDownloadButton>button:hover,
-        .stFormSubmitButton>button:hover {{
+        .stFormSubmitButton>button:hover {
             filter:brightness(0.95);
-        }}
+        }
         </style>
-        """, unsafe_allow_html=True)
+        """,
+}
+
+def apply_theme():
+    st.markdown(_THEME_CSS.get(st.session_state.get("ui_theme", "dark"), _THEME_CSS["light"]), unsafe_allow_html=True)
 
 # ------------------------
 # Constants & data model
 # ------------------------
 CURRENT_SEASON = datetime.now().year
 DATA_DIR = Path("data"); DATA_DIR.mkdir(exist_ok=True)
+UPLOADS_DIR = Path("uploads")  # created on first upload
 
-# Example asset catalogs per partner (can be replaced via upload)
-DEFAULT_ASSETS = {
+# Example asset catalogs per partner (can be replaced via upload).
+# Stored serialized so every fallback load gets its own copy instead of a shared mutable dict.
+_DEFAULT_ASSETS_JSON = {pid: json_dumps(cats) for pid, cats in {
     "coke": {
         "Digital Media": [
             {"name": "Social series (player Q&A video)", "season": CURRENT_SEASON},
@@ -133,7 +144,11 @@ DEFAULT_ASSETS = {
         "Signage": [{"name": "Concourse sampling footprint", "season": CURRENT_SEASON}],
         "Radio": [], "Television": [], "LED-Ribbon": [], "IP-Use of Marks": [], "Community Engagement": [],
     },
-}
+}.items()}
+
+def default_assets(pid: str) -> dict:
+    blob = _DEFAULT_ASSETS_JSON.get(pid)
+    return json_loads(blob) if blob else {}
 
 PARTNERS = {
     "active": [
@@ -149,40 +164,56 @@ PARTNERS = {
 # ------------------------
 # Helpers (routing, ids, storage)
 # ------------------------
+_SLUG_RE = re.compile(r"[\W_]")
+
+@lru_cache(maxsize=2048)
 def slug(s: str) -> str:
-    return "".join(ch.lower() if ch.isalnum() else "-" for ch in s).strip("-")
+    return _SLUG_RE.sub("-", s.lower()).strip("-")
+
+@st.cache_resource
+def _partner_index():
+    """{pid: (partner, scope)}; call _partner_index.clear() if PARTNERS becomes editable."""
+    return {p["id"]: (p, scope) for scope in ("active", "prospective") for p in PARTNERS[scope]}
 
 def _partner_by_id(pid):
-    for scope in ("active", "prospective"):
-        for p in PARTNERS[scope]:
-            if p["id"] == pid:
-                return p, scope
-    return None, None
+    return _partner_index().get(pid, (None, None))
+
+@st.cache_resource
+def _scope_partners(scope: str):
+    """(names, name_to_id) for a scope; names keep PARTNERS order."""
+    lst = PARTNERS.get(scope, [])
+    names = tuple(p["name"] for p in lst)
+    return names, dict(zip(names, (p["id"] for p in lst)))
 
 def my_profile():
     return profile()
 
-def set_route(page=None, scope=None, partner=None, section=None, replace=False):
-    """Update query params; rerun only on real change (prevents loops)."""
+def set_route(page=None, scope=None, partner=None, replace=False, rerun=True):
+    """Update query params; rerun only on real change (prevents loops).
+    Pass rerun=False when a widget change already triggered this run and the rest of it renders the new route."""
     qp = st.query_params
-    changed = False
-    if replace:
-        for k in list(qp.keys()): del qp[k]
-        changed = True
-    if page is not None and qp.get("page") != page: qp["page"] = page; changed = True
-    if scope is not None and qp.get("scope") != scope: qp["scope"] = scope; changed = True
+    # Build the target params locally, then sync them to the URL in a single write
+    before = qp.to_dict()
+    new = {} if replace else dict(before)
+    if page is not None: new["page"] = page
+    if scope is not None: new["scope"] = scope
     if partner is not None:
-        if partner in ("", None):
-            if "partner" in qp: del qp["partner"]; changed = True
-        elif qp.get("partner") != partner: qp["partner"] = partner; changed = True
-    if section is not None and qp.get("section") != section: qp["section"] = section; changed = True
-    if changed: st.rerun()
+        if partner == "": new.pop("partner", None)
+        else: new["partner"] = partner
+    if new == before:
+        return
+    qp.from_dict(new)
+    if rerun: st.rerun()
 
 # Query state
-current_page    = st.query_params.get("page", "Me")
-current_scope   = st.query_params.get("scope", "active")
-current_partner = st.query_params.get("partner", None)
-current_section = st.query_params.get("section", "overview")
+def parse_route() -> tuple[str, str, str | None]:
+    """(page, scope, partner) from one query-param snapshot."""
+    qp = st.query_params.to_dict()
+    return qp.get("page", "Me"), qp.get("scope", "active"), qp.get("partner")
+
+current_page, current_scope, current_partner = parse_route()
+# Resolved once per run; the sidebar and the Partnerships page both read it
+current_partner_rec, current_partner_scope = _partner_by_id(current_partner)
 
 # ------------------------
 # Persistence: local JSON with optional S3
@@ -194,31 +225,138 @@ def _local_path(kind: str, pid: str) -> Path:
 def _s3_key(kind: str, pid: str) -> str:
     return f"ssam/{kind}/{pid}.json"
 
-def save_json(kind: str, pid: str, data: dict | list) -> None:
-    payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+def _atomic_write(path: Path, payload: bytes) -> None:
+    """Write via a temp file + os.replace so readers never see a torn file."""
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")  # unique per writer
+    try:
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+@st.cache_resource
+def _io_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for S3 uploads so reruns don't wait on the network."""
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_resource
+def _read_pool() -> ThreadPoolExecutor:
+    """Process-wide pool for prefetch reads; separate from uploads so a retrying PUT can't stall a page."""
+    return ThreadPoolExecutor(max_workers=8)
+
+def _digest(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+def _remember_loaded(kind: str, pid: str, data) -> None:
+    """Record the digest of freshly loaded data so saving it back unchanged is skipped."""
+    st.session_state.setdefault("_saved_hash", {})[(kind, pid)] = _digest(json_dumps(data))
+
+@st.cache_resource
+def _save_versions() -> dict:
+    """{(kind, pid): digest} of the last save in this process; part of the read-cache key, so a save
+    invalidates only the entry it wrote."""
+    return {}
+
+@st.cache_resource
+def _upload_queue() -> dict:
+    """Process-wide S3 upload state: newest unsent payload per key, keys with a drain running,
+    and the digest each key last uploaded successfully."""
+    return {"lock": threading.Lock(), "pending": {}, "running": set(), "uploaded": {}}
+
+def _drain_uploads(key: str) -> None:
+    """Upload the newest payload queued for key until none is left. One drain per key keeps PUTs in order,
+    so an older save can never land after a newer one."""
+    q = _upload_queue()
+    while True:
+        with q["lock"]:
+            item = q["pending"].pop(key, None)
+            if item is None:
+                q["running"].discard(key)
+                return
+        payload, digest = item
+        for attempt in range(3):
+            if upload_bytes(key, payload, content_type="application/json"):
+                with q["lock"]:
+                    q["uploaded"][key] = digest
+                break
+            time.sleep(2 ** attempt)
+        else:
+            print("S3 save failed after 3 attempts; local copy kept:", key)
+
+def _queue_upload(key: str, payload: bytes, digest: bytes) -> None:
+    q = _upload_queue()
+    with q["lock"]:
+        q["pending"][key] = (payload, digest)  # supersedes any unsent older payload
+        if key in q["running"]:
+            return
+        q["running"].add(key)
+    _io_pool().submit(_drain_uploads, key)
+
+def _save_json_now(kind: str, pid: str, data: dict | list) -> None:
+    payload = json_dumps(data)
+    # skip no-op writes: same bytes as last loaded/persisted by this session (and already in S3)
+    digest = _digest(payload)
+    saved = st.session_state.setdefault("_saved_hash", {})
+    key, s3_on = _s3_key(kind, pid), s3_enabled()
+    if saved.get((kind, pid)) == digest and (not s3_on or _upload_queue()["uploaded"].get(key) == digest):
+        return
     # write local
-    _local_path(kind, pid).write_bytes(payload)
-    # optional S3
-    if s3_enabled():
-        upload_bytes(_s3_key(kind, pid), payload, content_type="application/json")
-
-def load_json(kind: str, pid: str, default):
-    # Try S3 first
-    if s3_enabled():
-        blob = download_bytes(_s3_key(kind, pid))
+    _atomic_write(_local_path(kind, pid), payload)
+    saved[(kind, pid)] = digest
+    # optional S3 (background, ordered per key)
+    if s3_on:
+        _queue_upload(key, payload, digest)
+    _save_versions()[(kind, pid)] = digest
+
+def _mark_dirty(kind: str, pid: str) -> None:
+    # kind matches the session_state bucket holding the data ("tasks" / "assets")
+    st.session_state.setdefault("_dirty", set()).add((kind, pid))
+
+def flush_pending_writes() -> None:
+    """Persist each dirty (kind, pid) once, however many edits queued it."""
+    dirty = st.session_state.get("_dirty")
+    while dirty:
+        kind, pid = dirty.pop()
+        _save_json_now(kind, pid, st.session_state[kind][pid])
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def _fetch_json_cached(kind: str, pid: str, s3_on: bool, mtime_ns: int | None, version: bytes | None):
+    """Parsed JSON for (kind, pid) or None; shared across reruns/sessions.
+    mtime_ns (local file) and version (last saved digest) are part of the key, so a save or a local edit
+    by another process misses only that entry; S3-only changes show up within the TTL."""
+    return _read_json(kind, pid, s3_on)
+
+def _read_fresher(key: str, lp: Path, s3_on: bool):
+    """Parsed JSON from whichever of the local file and the S3 object was written last, or None.
+    No st.* calls: also run from prefetch worker threads."""
+    try:
+        local_mtime = lp.stat().st_mtime
+    except OSError:
+        local_mtime = None
+    if s3_on and (local_mtime is None or (last_modified(key) or 0.0) > local_mtime):
+        blob = download_bytes(key)
         if blob:
             try:
-                return json.loads(blob.decode("utf-8"))
+                return json_loads(blob)
             except Exception:
                 pass
-    # Fallback local
-    lp = _local_path(kind, pid)
-    if lp.exists():
+    if local_mtime is not None:
         try:
-            return json.loads(lp.read_text(encoding="utf-8"))
+            return json_loads(lp.read_bytes())
         except Exception:
-            return default
-    return default
+            return None
+    return None
+
+def _read_json(kind: str, pid: str, s3_on: bool):
+    return _read_fresher(_s3_key(kind, pid), _local_path(kind, pid), s3_on)
+
+def load_json(kind: str, pid: str, default):
+    try:
+        mtime_ns = _local_path(kind, pid).stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    data = _fetch_json_cached(kind, pid, s3_enabled(), mtime_ns, _save_versions().get((kind, pid)))
+    return default if data is None else data
 
 # ------------------------
 # Profile persistence
@@ -226,37 +364,38 @@ def load_json(kind: str, pid: str, default):
 PROFILE_LOCAL = DATA_DIR / "profile.json"
 PROFILE_S3 = "ssam/profile/profile.json"
 
-DEFAULT_PROFILE = {
-    "name": st.secrets.get("USER_NAME", "Your Name"),
-    "email": st.secrets.get("USER_EMAIL", "you@example.com"),
-    "role": st.secrets.get("USER_ROLE", "AE"),  # AE, Admin, Brand, Agency
-    "partner_ids": [s.strip() for s in st.secrets.get("USER_PARTNERS", "coke").split(",") if s.strip()],
-    "photo": st.secrets.get("USER_PHOTO_URL", None),
-}
+@st.cache_data(show_spinner=False)
+def _default_profile() -> dict:
+    """Profile seeded from secrets; read once per process (cache_data hands each caller its own copy)."""
+    return {
+        "name": st.secrets.get("USER_NAME", "Your Name"),
+        "email": st.secrets.get("USER_EMAIL", "you@example.com"),
+        "role": st.secrets.get("USER_ROLE", "AE"),  # AE, Admin, Brand, Agency
+        "partner_ids": [s.strip() for s in st.secrets.get("USER_PARTNERS", "coke").split(",") if s.strip()],
+        "photo": st.secrets.get("USER_PHOTO_URL", None),
+    }
 
 def save_profile(profile: dict):
-    payload = json.dumps(profile, ensure_ascii=False, indent=2).encode("utf-8")
-    PROFILE_LOCAL.write_bytes(payload)
+    payload = json_dumps(profile, indent=True)
+    _atomic_write(PROFILE_LOCAL, payload)
+    digest = _digest(payload)
     if s3_enabled():
-        upload_bytes(PROFILE_S3, payload, content_type="application/json")
+        _queue_upload(PROFILE_S3, payload, digest)
+    _save_versions()[("profile", "")] = digest
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_profile_cached(s3_on: bool, mtime_ns: int | None, version: bytes | None):
+    """Parsed stored profile or None; keyed like _fetch_json_cached."""
+    return _read_fresher(PROFILE_S3, PROFILE_LOCAL, s3_on)
 
 def load_profile() -> dict:
-    # Try S3 first
-    if s3_enabled():
-        blob = download_bytes(PROFILE_S3)
-        if blob:
-            try:
-                return json.loads(blob.decode("utf-8"))
-            except Exception:
-                pass
-    # Fallback local
-    if PROFILE_LOCAL.exists():
-        try:
-            return json.loads(PROFILE_LOCAL.read_text(encoding="utf-8"))
-        except Exception:
-            return DEFAULT_PROFILE
+    try:
+        mtime_ns = PROFILE_LOCAL.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    data = _fetch_profile_cached(s3_enabled(), mtime_ns, _save_versions().get(("profile", "")))
     # Default
-    return DEFAULT_PROFILE
+    return _default_profile() if data is None else data
 
 def profile() -> dict:
     """Cached profile in session_state."""
@@ -272,35 +411,114 @@ def load_assets_for(pid: str):
         st.session_state["assets"] = {}
     if pid not in st.session_state["assets"]:
         # load from storage or default
-        data = load_json("assets", pid, DEFAULT_ASSETS.get(pid, {}))
+        data = load_json("assets", pid, None)
+        if data is None:
+            data = default_assets(pid)
         st.session_state["assets"][pid] = data
+        _remember_loaded("assets", pid, data)
 
 def ensure_partner_state(pid: str):
-    if "tasks" not in st.session_state:
-        st.session_state["tasks"] = {}  # tasks[pid] = list of dicts
-    if pid not in st.session_state["tasks"]:
-        task_list = load_json("tasks", pid, [])
-        st.session_state["tasks"][pid] = task_list
-
-    if "asset_sel" not in st.session_state:
-        st.session_state["asset_sel"] = {}
-    if pid not in st.session_state["asset_sel"]:
+    ss = st.session_state
+    init = ss.setdefault("_init_pids", set())
+    if pid in init:
+        return
+    tasks = ss.setdefault("tasks", {})  # tasks[pid] = list of dicts
+    if pid not in tasks:
+        tasks[pid] = task_list = load_json("tasks", pid, [])
+        _remember_loaded("tasks", pid, task_list)
+    if pid not in ss.get("tasks_index", {}):
+        _reindex_tasks(pid)
+
+    asset_sel = ss.setdefault("asset_sel", {})
+    if pid not in asset_sel:
         load_assets_for(pid)
-        st.session_state["asset_sel"][pid] = {}
-        for cat, items in st.session_state["assets"][pid].items():
-            st.session_state["asset_sel"][pid][cat] = {a["name"]: False for a in items}
+        asset_sel[pid] = {cat: {a["name"]: False for a in items} for cat, items in ss["assets"][pid].items()}
+    init.add(pid)
+
+def _reindex_tasks(pid: str):
+    """tasks_index[pid] = {task id: position in tasks[pid]}."""
+    st.session_state.setdefault("tasks_index", {})[pid] = {
+        t["id"]: i for i, t in enumerate(st.session_state["tasks"][pid])
+    }
+
+def prefetch_partner_state(pids) -> None:
+    """Load tasks/assets for pids not yet in session, overlapping the S3/disk reads."""
+    ss = st.session_state
+    todo = [(kind, pid) for pid in pids for kind in ("tasks", "assets") if pid not in ss.get(kind, {})]
+    if todo:
+        s3_on = s3_enabled()
+        results = list(_read_pool().map(lambda k: _read_json(*k, s3_on), todo))
+        for (kind, pid), data in zip(todo, results):
+            if data is None:
+                data = [] if kind == "tasks" else default_assets(pid)
+            ss.setdefault(kind, {})[pid] = data
+            _remember_loaded(kind, pid, data)
+    for pid in pids:
+        ensure_partner_state(pid)
 
 def save_tasks(pid: str):
-    save_json("tasks", pid, st.session_state["tasks"][pid])
+    versions = st.session_state.setdefault("tasks_version", {})
+    versions[pid] = versions.get(pid, 0) + 1
+    _mark_dirty("tasks", pid)
 
 def save_assets(pid: str):
-    save_json("assets", pid, st.session_state["assets"][pid])
+    versions = st.session_state.setdefault("assets_version", {})
+    versions[pid] = versions.get(pid, 0) + 1
+    _mark_dirty("assets", pid)
+
+def _asset_views(pid: str) -> dict:
+    """Derived views of pid's catalog (labels, categories, seasons, columns, overview markdown);
+    cached per session and rebuilt only after save_assets bumps the version."""
+    ver = st.session_state.get("assets_version", {}).get(pid, 0)
+    cache = st.session_state.setdefault("_asset_views_cache", {})
+    hit = cache.get(pid)
+    if hit and hit[0] == ver:
+        return hit[1]
+    cats = st.session_state["assets"][pid]
+    cs = CURRENT_SEASON
+    labels, row_cats, row_names, row_seasons = [], [], [], []
+    for cat, items in cats.items():
+        for a in items:
+            labels.append(f"{cat} — {a['name']}")
+            row_cats.append(cat); row_names.append(a["name"]); row_seasons.append(a.get("season", cs))
+    views = {"labels": labels, "categories": list(cats), "seasons": sorted(set(row_seasons)),
+             "rows": (row_cats, row_names, row_seasons),
+             "overview_md": {cat: "\n".join(f"- {a['name']}  ·  Season {a.get('season', cs)}" for a in items)
+                             for cat, items in cats.items()}}
+    cache[pid] = (ver, views)
+    return views
+
+def _asset_editor_base(pid: str):
+    """Frame the assets data_editor is seeded with: catalog rows plus asset_sel as of the last snapshot.
+    Kept identical across reruns so the editor's own stored edits carry the toggles; re-taken only
+    when save_assets bumps the version or Select All drops it."""
+    ver = st.session_state.get("assets_version", {}).get(pid, 0)
+    bases = st.session_state.setdefault("_asset_editor_base", {})
+    hit = bases.get(pid)
+    if hit and hit[0] == ver:
+        return hit[1]
+    import pandas as pd
+    sel = st.session_state["asset_sel"][pid]
+    row_cats, row_names, row_seasons = _asset_views(pid)["rows"]
+    selected = [bool(sel.get(c, {}).get(n, False)) for c, n in zip(row_cats, row_names)]
+    df = pd.DataFrame({"category": row_cats, "asset": row_names, "season": row_seasons, "selected": selected},
+                      columns=["category", "asset", "season", "selected"])
+    bases[pid] = (ver, df)
+    st.session_state.pop(f"assets_editor_{pid}", None)  # old edits were relative to the previous snapshot
+    return df
+
+def get_all_assets(pid: str) -> list[str]:
+    """"Category — Asset" labels for pid."""
+    return _asset_views(pid)["labels"]
 
 # Task operations
 def new_task(pid: str, asset: str, desc: str, specs: str, qty: int, classification: str, assignee: str | None):
     ensure_partner_state(pid)
-    st.session_state["tasks"][pid].append({
-        "id": str(uuid.uuid4()),
+    tasks = st.session_state["tasks"][pid]
+    task_id = str(uuid.uuid4())
+    st.session_state["tasks_index"][pid][task_id] = len(tasks)
+    tasks.append({
+        "id": task_id,
         "asset": asset,
         "description": desc,
         "specifications": specs,
@@ -313,35 +531,57 @@ def new_task(pid: str, asset: str, desc: str, specs: str, qty: int, classificati
     save_tasks(pid)
 
 def update_task(pid: str, task_id: str, **fields):
+    bulk_update_tasks(pid, [task_id], **fields)
+
+def bulk_update_tasks(pid: str, ids: list[str], **fields):
+    """Apply the same field changes to every task in ids, then persist once."""
     ensure_partner_state(pid)
-    for t in st.session_state["tasks"][pid]:
-        if t["id"] == task_id:
-            t.update({k: v for k, v in fields.items() if v is not None})
-            break
+    changes = {k: v for k, v in fields.items() if v is not None}
+    tasks = st.session_state["tasks"][pid]
+    index = st.session_state["tasks_index"][pid]
+    for tid in set(ids):
+        i = index.get(tid)
+        if i is not None:
+            tasks[i].update(changes)
     save_tasks(pid)
 
 def delete_tasks(pid: str, ids: list[str]):
     ensure_partner_state(pid)
-    st.session_state["tasks"][pid] = [t for t in st.session_state["tasks"][pid] if t["id"] not in ids]
+    ids_set = set(ids)
+    st.session_state["tasks"][pid] = [t for t in st.session_state["tasks"][pid] if t["id"] not in ids_set]
+    _reindex_tasks(pid)
     save_tasks(pid)
 
 # Export helpers
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _assets_csv_bytes(pid: str, cats: dict, sel: dict) -> bytes:
+    """CSV bytes for a catalog + selection; cached on the hashed (pid, cats, sel) args.
+    Rows are written straight from the catalog (no DataFrame), in pandas' to_csv format."""
+    cs = CURRENT_SEASON
+    buf = io.BytesIO()
+    with io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True) as tw:
+        w = csv.writer(tw, lineterminator="\n")
+        w.writerow(("partner_id", "category", "asset", "season", "selected"))
+        for cat, items in cats.items():
+            sel_cat = sel.get(cat, {})
+            w.writerows((pid, cat, a["name"], a.get("season", cs), bool(sel_cat.get(a["name"], False)))
+                        for a in items)
+        return buf.getvalue()
+
 def export_assets_csv(pid: str) -> bytes:
     load_assets_for(pid); ensure_partner_state(pid)
-    rows = []
-    cats = st.session_state["assets"][pid]
-    sel = st.session_state["asset_sel"][pid]
-    for cat, items in cats.items():
-        for a in items:
-            rows.append({
-                "partner_id": pid,
-                "category": cat,
-                "asset": a["name"],
-                "season": a.get("season", CURRENT_SEASON),
-                "selected": bool(sel.get(cat, {}).get(a["name"], False)),
-            })
-    df = pd.DataFrame(rows)
-    return df.to_csv(index=False).encode("utf-8")
+    return _assets_csv_bytes(pid, st.session_state["assets"][pid], st.session_state["asset_sel"][pid])
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _tasks_xlsx_bytes(tasks: list) -> bytes:
+    """Workbook bytes for a task list; cached on the hashed task contents."""
+    import pandas as pd
+    df = pd.DataFrame(tasks)
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as xw:
+        df.to_excel(xw, index=False, sheet_name="Tasks")
+    buf.seek(0)
+    return buf.getvalue()
 
 def export_tasks_xlsx(pid: str) -> bytes | None:
     try:
@@ -349,57 +589,66 @@ def export_tasks_xlsx(pid: str) -> bytes | None:
     except Exception:
         return None
     ensure_partner_state(pid)
-    df = pd.DataFrame(st.session_state["tasks"][pid])
+    return _tasks_xlsx_bytes(st.session_state["tasks"][pid])
+
+def _csv_bytes(rows, fieldnames) -> bytes:
+    """DictWriter encoding straight into a bytes buffer (no intermediate str)."""
     buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as xw:
-        df.to_excel(xw, index=False, sheet_name="Tasks")
-    buf.seek(0)
-    return buf.getvalue()
+    with io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True) as tw:
+        w = csv.DictWriter(tw, fieldnames=fieldnames)
+        w.writeheader()
+        w.writerows(rows)
+        return buf.getvalue()
+
+def export_tasks_csv(pid: str) -> bytes:
+    """Tasks as CSV straight from the list of dicts (no pandas)."""
+    ensure_partner_state(pid)
+    tasks = st.session_state["tasks"][pid]
+    fieldnames = list(dict.fromkeys(k for t in tasks for k in t))  # union of keys, first-seen order
+    return _csv_bytes(tasks, fieldnames)
 
 # ------------------------
 # Sidebar (navigation)
 # ------------------------
+PAGES = ("Me","Partnerships","Prospecting","Selling","Reports",
+         "Users","Presentations","Files","Contracts","Data","Settings")
+PAGE_IDX = {name: i for i, name in enumerate(PAGES)}
+
+@st.cache_resource
+def _header_logo_bytes() -> bytes | None:
+    """Logo bytes read once per process (shared, never mutated)."""
+    return HEADER_LOGO.read_bytes() if HEADER_LOGO.exists() else None
+
+@st.fragment
+def _partner_picker(scope: str):
+    """Scope/brand pickers rerun on their own; only "Open ▶" reruns the whole app."""
+    scope = st.selectbox("Scope", ["active","prospective"],
+                         index=0 if scope=="active" else 1, key="scope_select")
+
+    names, name_to_id = _scope_partners(scope)
+    if names:
+        pick = st.selectbox("Open brand page", names, key="brand_select")
+        if st.button("Open ▶"):
+            set_route(page="Partnerships", scope=scope, partner=name_to_id[pick])
+
+    if current_partner_rec:
+        # Brand sections are the page's st.tabs (switched client-side, no rerun)
+        st.caption(f"↳ **{current_partner_rec['name']}**")
+
 with st.sidebar:
-    if HEADER_LOGO.exists():
-        st.image(str(HEADER_LOGO), width=96)
+    logo = _header_logo_bytes()
+    if logo:
+        st.image(logo, width=96)
 
     # Theme toggle
     st.selectbox("Theme", ["dark", "light"], index=0 if st.session_state.get("ui_theme","dark")=="dark" else 1,
                  key="ui_theme", on_change=apply_theme)
 
-    PAGES = ["Me","Partnerships","Prospecting","Selling","Reports",
-             "Users","Presentations","Files","Contracts","Data","Settings"]
-
-    try:
-        start_idx = PAGES.index(current_page)
-    except ValueError:
-        start_idx = 0
-
-    sel = st.radio("Navigate", PAGES, index=start_idx, key="nav_radio")
-    if sel != current_page: set_route(page=sel)
+    sel = st.radio("Navigate", PAGES, index=PAGE_IDX.get(current_page, 0), key="nav_radio")
+    if sel != current_page: set_route(page=sel, rerun=False)
 
     if sel == "Partnerships":
-        current_scope = st.selectbox("Scope", ["active","prospective"],
-                                     index=0 if current_scope=="active" else 1, key="scope_select")
-
-        names = [p["name"] for p in PARTNERS[current_scope]]
-        ids   = [p["id"]   for p in PARTNERS[current_scope]]
-        if names:
-            pick = st.selectbox("Open brand page", names, key="brand_select")
-            pid  = ids[names.index(pick)]
-            if st.button("Open ▶"):
-                set_route(page="Partnerships", scope=current_scope, partner=pid, section="overview")
-
-        if current_partner:
-            p, _ = _partner_by_id(current_partner)
-            if p:
-                st.markdown(f"<div style='margin-left:10px; color:#bbb;'>↳ <b>{p['name']}</b></div>", unsafe_allow_html=True)
-                sections = ["overview","tasks","files","calendar","social","presentations","data"]
-                try: sec_idx = sections.index(current_section)
-                except ValueError: sec_idx = 0
-                sub = st.selectbox("Brand section", sections, index=sec_idx, key="brand_section_select")
-                if st.button("Go"):
-                    set_route(page="Partnerships", scope=current_scope, partner=current_partner, section=sub)
+        _partner_picker(current_scope)
 
 current_page = sel
 
@@ -409,15 +658,47 @@ current_page = sel
 def breadcrumb(*parts):
     st.caption(" › ".join(parts))
 
+_TOAST = getattr(st, "toast", None)  # feature probe resolved once, not per call
+
 def toast(msg, kind="info"):
-    if hasattr(st, "toast"):
-        st.toast(msg)
+    if _TOAST:
+        _TOAST(msg)
     else:
         (st.success if kind=="success" else st.info)(msg)
 
 # ------------------------
 # Pages
 # ------------------------
+@st.cache_resource
+def _partner_label_maps():
+    """(all_partner_ids, id_to_label, label_to_id, all_labels); clear if PARTNERS becomes editable."""
+    all_partner_ids = []
+    id_to_label = {}
+    for scope in ("active", "prospective"):
+        for item in PARTNERS.get(scope, []):
+            all_partner_ids.append(item["id"])
+            id_to_label[item["id"]] = f"{item['name']} ({scope})"
+    label_to_id = {v: k for k, v in id_to_label.items()}
+    all_labels = [id_to_label[pid] for pid in all_partner_ids]
+    return all_partner_ids, id_to_label, label_to_id, all_labels
+
+def _my_tasks_df(my_email: str):
+    """Tasks assigned to my_email across all loaded partners; cached per session and rebuilt only when
+    the email, the loaded partners or a save_tasks version changes (no hashing of the task lists)."""
+    ss = st.session_state
+    versions = ss.get("tasks_version", {})
+    key = (my_email, tuple((pid, versions.get(pid, 0)) for pid in ss.get("tasks", {})))
+    hit = ss.get("_my_tasks_cache")
+    if hit and hit[0] == key:
+        return hit[1]
+    import pandas as pd
+    rows = [{"partner": pr["name"], **t}
+            for pid, (pr, _) in _partner_index().items()
+            for t in ss.get("tasks", {}).get(pid, []) if t.get("assignee","").lower() == my_email]
+    df = pd.DataFrame.from_records(rows)
+    ss["_my_tasks_cache"] = (key, df)
+    return df
+
 def render_me():
     p = profile()
 
@@ -435,13 +716,8 @@ def render_me():
 
     # ---------- Edit Profile ----------
     with st.expander("Edit profile", expanded=False):
-        # Build partner choices from your PARTNERS dictionary
-        all_partner_ids = []
-        id_to_label = {}
-        for scope in ("active", "prospective"):
-            for item in PARTNERS.get(scope, []):
-                all_partner_ids.append(item["id"])
-                id_to_label[item["id"]] = f"{item['name']} ({scope})"
+        # Partner choices from PARTNERS (cached; only the user's picks vary)
+        all_partner_ids, id_to_label, label_to_id, all_labels = _partner_label_maps()
 
         default_ids = [pid for pid in p.get("partner_ids", []) if pid in all_partner_ids]
 
@@ -453,11 +729,9 @@ def render_me():
 
             # show labels in UI; store ids
             pick_labels = [id_to_label[pid] for pid in default_ids]
-            all_labels = [id_to_label[pid] for pid in all_partner_ids]
             chosen_labels = st.multiselect("Partners you work with", options=all_labels, default=pick_labels)
             chosen_ids = []
             # map back to ids
-            label_to_id = {v:k for k,v in id_to_label.items()}
             for lab in chosen_labels:
                 if lab in label_to_id:
                     chosen_ids.append(label_to_id[lab])
@@ -471,15 +745,18 @@ def render_me():
             # If a photo file is uploaded, save locally (or push to S3)
             final_photo = photo_url.strip()
             if photo_file is not None:
-                Path("uploads").mkdir(exist_ok=True)
-                dest = Path("uploads") / f"profile_{slug(name)}_{photo_file.name}"
+                UPLOADS_DIR.mkdir(exist_ok=True)
+                dest = UPLOADS_DIR / f"profile_{slug(name)}_{photo_file.name}"
+                photo_file.seek(0)
                 with open(dest, "wb") as f:
-                    f.write(photo_file.getbuffer())
+                    shutil.copyfileobj(photo_file, f, length=1 << 20)
                 final_photo = str(dest)
-                # Optional S3
+                # Optional S3 (streamed from the saved file)
                 if s3_enabled():
                     key = f"ssam/photos/{dest.name}"
-                    if upload_bytes(key, photo_file.getbuffer(), content_type=photo_file.type):
+                    with open(dest, "rb") as fh:
+                        uploaded = upload_fileobj(key, fh, content_type=photo_file.type)
+                    if uploaded:
                         s3_url = presigned_url(key)
                         if s3_url:
                             final_photo = s3_url
@@ -499,63 +776,102 @@ def render_me():
 
     st.markdown("---")
     st.subheader("My Partners")
-    any_btn = False
-    for pid in p.get("partner_ids", []):
-        pr, scope = _partner_by_id(pid)
-        if not pr:
-            continue
-        any_btn = True
+    index = _partner_index()
+    resolved = [(pid, *index[pid]) for pid in p.get("partner_ids", []) if pid in index]
+    for pid, pr, scope in resolved:
         if st.button(f"Open {pr['name']} ▶", key=f"me_open_{pid}"):
-            set_route(page="Partnerships", scope=scope or "active", partner=pid, section="overview")
-    if not any_btn:
+            set_route(page="Partnerships", scope=scope or "active", partner=pid)
+    if not resolved:
         st.caption("No partners assigned yet.")
 
     # ---------- My Tasks ----------
     st.markdown("---")
     st.subheader("My Tasks")
     my_email = p.get("email","").lower()
-    rows = []
-    for scope in PARTNERS:
-        for pr in PARTNERS[scope]:
-            pid = pr["id"]; ensure_partner_state(pid)
-            for t in st.session_state["tasks"][pid]:
-                if t.get("assignee","").lower() == my_email and my_email:
-                    rows.append({"partner": pr["name"], **t})
-    if rows:
-        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    prefetch_partner_state(list(_partner_index()))
+    df = _my_tasks_df(my_email) if my_email else None
+    if df is not None and not df.empty:
+        st.dataframe(df, use_container_width=True)
     else:
         st.caption("No tasks assigned to you yet.")
 
-    # My Tasks (aggregated)
     st.markdown("---")
 
+def _edit_task_form(pid: str, edit_id: str):
+    i = st.session_state["tasks_index"][pid].get(edit_id)
+    if i is None:
+        return
+    ed_task = st.session_state["tasks"][pid][i]
+    with st.expander("Edit Task", expanded=True):
+        with st.form("edit_task_form_inline", clear_on_submit=True):
+            new_desc  = st.text_area("Task description", value=ed_task.get("description",""))
+            new_specs = st.text_area("Specifications / production notes", value=ed_task.get("specifications",""))
+            new_qty   = st.number_input("Quantity", min_value=1, step=1, value=int(ed_task.get("quantity",1)))
+            new_type  = st.selectbox("Type", ["contracted","value added"],
+                                     index=0 if ed_task.get("type")=="contracted" else 1)
+            new_assignee = st.text_input("Assignee (email)", value=ed_task.get("assignee",""))
+            new_status = st.selectbox("Status", ["open","complete"],
+                                      index=0 if ed_task.get("status","open")=="open" else 1)
+            ok = st.form_submit_button("Save Changes")
+        if ok:
+            update_task(pid, edit_id, description=new_desc, specifications=new_specs,
+                        quantity=int(new_qty), type=new_type, assignee=new_assignee, status=new_status)
+            st.session_state["edit_task_id"] = None
+            toast("Task updated.", "success"); st.rerun()
+
+# Fragment: typing in the assignee box reruns only this block. A successful change still
+# reruns the whole app once, so the task list refreshes and the queued write is flushed.
+@st.fragment
+def _bulk_actions_fragment(pid: str, sel_ids: list[str], can_edit: bool):
+    st.markdown("#### Bulk Actions")
+    b1, b2, b3 = st.columns([1,1,1])
+    with b1:
+        if can_edit and st.button("Mark Complete", disabled=not sel_ids, key=f"bulk_complete_{pid}"):
+            bulk_update_tasks(pid, sel_ids, status="complete")
+            toast("Selected tasks marked complete.", "success"); st.rerun(scope="app")
+    with b2:
+        assign_to = st.text_input("Assign to (email)", key=f"bulk_assign_to_{pid}")
+        if can_edit and st.button("Assign", disabled=not sel_ids or not assign_to, key=f"bulk_assign_{pid}"):
+            bulk_update_tasks(pid, sel_ids, assignee=assign_to)
+            toast("Selected tasks assigned.", "success"); st.rerun(scope="app")
+    with b3:
+        if can_edit and st.button("Delete Selected", disabled=not sel_ids, key=f"bulk_delete_{pid}"):
+            delete_tasks(pid, sel_ids); toast("Selected tasks deleted.", "success"); st.rerun(scope="app")
+
+@st.cache_resource
+def _tableau():
+    """TableauClient, imported and built the first time the Data tab renders; None if unavailable."""
+    try:
+        from services.providers import TableauClient
+    except Exception:
+        return None
+    return TableauClient()
+
 def _brand_tabs(pid: str, partner_name: str, scope: str):
     """Brand page with tabs and a robust inline Tasks UX."""
     role = profile().get("role", "AE").lower()
     can_edit = role in ("ae", "admin")
 
-    # Ensure state ready before UI uses it
-    load_assets_for(pid)
-    ensure_partner_state(pid)
+    # Ensure state ready before UI uses it (tasks + assets fetched in parallel)
+    prefetch_partner_state([pid])
 
     st.subheader(f"{partner_name} — {scope.title()} Partnership")
-    breadcrumb("Partnerships", partner_name, current_section.title())
+    breadcrumb("Partnerships", partner_name)
 
     tabs = st.tabs(["overview","tasks","files","calendar","social","presentations","data"])
 
     # ---------------- OVERVIEW ----------------
     with tabs[0]:
         st.markdown("**Assets in contract (by category)**")
-        cats = st.session_state["assets"][pid]
-        if cats:
-            for cat, items in cats.items():
+        overview = _asset_views(pid)["overview_md"]
+        if overview:
+            for cat, md in overview.items():
                 with st.expander(cat, expanded=False):
-                    for a in items:
-                        st.write(f"• {a['name']}  ·  Season {a.get('season', CURRENT_SEASON)}")
+                    st.markdown(md)
         else:
             st.caption("No assets listed yet.")
         if st.button("← Back to all partnerships"):
-            set_route(page="Partnerships", scope=scope, partner=None, section=None)
+            set_route(page="Partnerships", scope=scope, partner="")
 
     # ---------------- TASKS ----------------
     with tabs[1]:
@@ -580,9 +896,10 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
 
         # Bulk select assets
         if select_all_clicked:
-            for cat in st.session_state["asset_sel"][pid]:
-                for name in st.session_state["asset_sel"][pid][cat]:
-                    st.session_state["asset_sel"][pid][cat][name] = True
+            sel = st.session_state["asset_sel"][pid]
+            for cat, d in sel.items():
+                sel[cat] = dict.fromkeys(d, True)
+            st.session_state.get("_asset_editor_base", {}).pop(pid, None)  # re-seed the editor from the new state
             toast("All assets selected.", "success")
 
         # Export assets CSV
@@ -605,9 +922,8 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
                                    key=f"dl_tasks_{pid}")
             else:
                 st.warning("Excel export requires `openpyxl`. Falling back to CSV below.")
-                df = pd.DataFrame(st.session_state["tasks"][pid])
                 st.download_button("Download Tasks.csv",
-                                   data=df.to_csv(index=False).encode("utf-8"),
+                                   data=export_tasks_csv(pid),
                                    file_name=f"{partner_name}_tasks.csv",
                                    mime="text/csv",
                                    key=f"dl_tasks_csv_{pid}")
@@ -617,11 +933,12 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
             st.session_state[f"show_new_task_form_{pid}"] = True
 
         if st.session_state.get(f"show_new_task_form_{pid}") and can_edit:
-            cats = st.session_state["assets"][pid]
-            all_assets = [f"{cat} — {a['name']}" for cat, items in cats.items() for a in items]
+            views = _asset_views(pid)
+            labels, asset_names = views["labels"], views["rows"][1]
 
             with st.form(f"form_new_task_{pid}", clear_on_submit=False):
-                asset_pick = st.selectbox("Asset", all_assets, key=f"nt_asset_{pid}")
+                # Options are row indexes, so the asset name is looked up rather than split out of the label
+                asset_idx = st.selectbox("Asset", range(len(labels)), format_func=labels.__getitem__, key=f"nt_asset_{pid}")
                 desc  = st.text_area("Task description", key=f"nt_desc_{pid}")
                 specs = st.text_area("Specifications / production notes", key=f"nt_specs_{pid}")
                 qty   = st.number_input("Quantity", min_value=1, step=1, value=1, key=f"nt_qty_{pid}")
@@ -635,8 +952,7 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
                     cancel_clicked = st.form_submit_button("Cancel")
 
             if save_clicked:
-                asset_name = asset_pick.split(" — ", 1)[1] if " — " in asset_pick else asset_pick
-                new_task(pid, asset_name, desc, specs, int(qty), classification, assignee)
+                new_task(pid, asset_names[asset_idx] if asset_idx is not None else "", desc, specs, int(qty), classification, assignee)
                 st.session_state.pop(f"show_new_task_form_{pid}", None)
                 toast("Task created.", "success")
                 st.rerun()
@@ -647,15 +963,15 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
 
         # ---- Filters
         st.markdown("#### Filters")
-        cats = st.session_state["assets"][pid]
-        all_categories = list(cats.keys())
+        views = _asset_views(pid)
+        all_categories = views["categories"]
         fcol1, fcol2, fcol3 = st.columns([1,1,1])
         with fcol1:
             pick_cats = st.multiselect("Category", all_categories, default=all_categories, key=f"fcat_{pid}")
         with fcol2:
             pick_types = st.multiselect("Type", ["contracted","value added"], default=["contracted","value added"], key=f"ftype_{pid}")
         with fcol3:
-            seasons = sorted({a.get("season", CURRENT_SEASON) for items in cats.values() for a in items})
+            seasons = views["seasons"]
             pick_season = st.selectbox("Season", seasons, index=len(seasons)-1, key=f"fseason_{pid}")
 
         # ---- Task list
@@ -683,63 +999,44 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
         # ---- Edit existing task (inline/expander fallback)
         edit_id = st.session_state.get("edit_task_id")
         if can_edit and edit_id:
-            ed_task = next((x for x in st.session_state["tasks"][pid] if x["id"] == edit_id), None)
-            if ed_task:
-                with st.expander("Edit Task", expanded=True):
-                    with st.form("edit_task_form_inline"):
-                        new_desc  = st.text_area("Task description", value=ed_task.get("description",""))
-                        new_specs = st.text_area("Specifications / production notes", value=ed_task.get("specifications",""))
-                        new_qty   = st.number_input("Quantity", min_value=1, step=1, value=int(ed_task.get("quantity",1)))
-                        new_type  = st.selectbox("Type", ["contracted","value added"],
-                                                 index=0 if ed_task.get("type")=="contracted" else 1)
-                        new_assignee = st.text_input("Assignee (email)", value=ed_task.get("assignee",""))
-                        new_status = st.selectbox("Status", ["open","complete"],
-                                                  index=0 if ed_task.get("status","open")=="open" else 1)
-                        ok = st.form_submit_button("Save Changes")
-                    if ok:
-                        update_task(pid, edit_id, description=new_desc, specifications=new_specs,
-                                    quantity=int(new_qty), type=new_type, assignee=new_assignee, status=new_status)
-                        st.session_state["edit_task_id"] = None
-                        toast("Task updated.", "success"); st.rerun()
+            _edit_task_form(pid, edit_id)
 
         # ---- Bulk actions
-        st.markdown("#### Bulk Actions")
-        b1, b2, b3 = st.columns([1,1,1])
-        with b1:
-            if can_edit and st.button("Mark Complete", disabled=not sel_ids, key=f"bulk_complete_{pid}"):
-                for tid in sel_ids: update_task(pid, tid, status="complete")
-                toast("Selected tasks marked complete.", "success"); st.rerun()
-        with b2:
-            assign_to = st.text_input("Assign to (email)", key=f"bulk_assign_to_{pid}")
-            if can_edit and st.button("Assign", disabled=not sel_ids or not assign_to, key=f"bulk_assign_{pid}"):
-                for tid in sel_ids: update_task(pid, tid, assignee=assign_to)
-                toast("Selected tasks assigned.", "success"); st.rerun()
-        with b3:
-            if can_edit and st.button("Delete Selected", disabled=not sel_ids, key=f"bulk_delete_{pid}"):
-                delete_tasks(pid, sel_ids); toast("Selected tasks deleted.", "success"); st.rerun()
+        _bulk_actions_fragment(pid, sel_ids, can_edit)
 
         st.markdown("---")
         st.markdown("### Assets (select for export)")
-        for cat, items in st.session_state["assets"][pid].items():
-            st.markdown(f"**{cat}**")
-            for a in items:
-                left, right = st.columns([0.9, 0.1])
-                with left:
-                    key = f"chk_{pid}_{slug(cat)}_{slug(a['name'])}"
-                    cur = st.session_state["asset_sel"][pid][cat].get(a["name"], False)
-                    checked = st.checkbox(a["name"], value=cur, key=key)
-                    st.session_state["asset_sel"][pid][cat][a["name"]] = checked
-                with right:
-                    st.markdown(f"<div style='text-align:right;'>Season {a.get('season', CURRENT_SEASON)}</div>", unsafe_allow_html=True)
+        # One data_editor for all assets instead of a checkbox (+ columns) per asset
+        sel = st.session_state["asset_sel"][pid]
+        # Seeded from a stable snapshot, never from its own output; the widget's edits carry the toggles
+        edited = st.data_editor(
+            _asset_editor_base(pid),
+            column_config={"selected": st.column_config.CheckboxColumn("Selected")},
+            disabled=["category", "asset", "season"],
+            hide_index=True, use_container_width=True, key=f"assets_editor_{pid}",
+        )
+        # rows come grouped by category: bind each sub-dict once, write only real changes
+        last_cat = sel_cat = None
+        for cat, name, checked in zip(edited["category"], edited["asset"], edited["selected"]):
+            if cat != last_cat:
+                last_cat, sel_cat = cat, sel.setdefault(cat, {})
+            checked = bool(checked)
+            if sel_cat.get(name) is not checked:
+                sel_cat[name] = checked
 
     # ---------------- FILES ----------------
     with tabs[2]:
         st.info("Files (dummy): integrate S3/Drive later.")
         upl = st.file_uploader("Upload asset", type=["png","jpg","jpeg","pdf","pptx","docx"], key=f"files_{pid}")
         if upl and st.button("Save file", key=f"filesave_{pid}"):
-            Path("uploads").mkdir(exist_ok=True)
-            with open(Path("uploads")/upl.name, "wb") as f: f.write(upl.getbuffer())
-            toast("File saved (local demo).", "success")
+            if st.session_state.get(f"files_saved_{pid}") == upl.file_id:
+                toast("File already saved.")
+            else:
+                UPLOADS_DIR.mkdir(exist_ok=True)
+                upl.seek(0)
+                with open(UPLOADS_DIR/upl.name, "wb") as f: shutil.copyfileobj(upl, f, length=1 << 20)
+                st.session_state[f"files_saved_{pid}"] = upl.file_id
+                toast("File saved (local demo).", "success")
 
     # ---------------- CALENDAR ----------------
     with tabs[3]:
@@ -756,31 +1053,28 @@ def _brand_tabs(pid: str, partner_name: str, scope: str):
     # ---------------- DATA ----------------
     with tabs[6]:
         st.info("Data (dummy): Tableau/QBR/engagement KPIs.")
-        if TableauClient:
+        if _tableau():
             st.caption("Tableau integration stub here.")
 
 def render_partnerships():
     if current_partner:
-        partner, scope = _partner_by_id(current_partner)
-        if not partner:
+        if not current_partner_rec:
             st.error("Partner not found."); return
-        _brand_tabs(current_partner, partner["name"], scope)
+        _brand_tabs(current_partner, current_partner_rec["name"], current_partner_scope)
         return
 
-    st.subheader("Active Partnerships")
-    cols = st.columns(3)
-    for i, p in enumerate(PARTNERS["active"]):
-        with cols[i % 3]:
-            if st.button(p["name"], key=f"act_{p['id']}"):
-                set_route(page="Partnerships", scope="active", partner=p["id"], section="overview")
-
-    st.markdown("---")
-    st.subheader("Prospective Partnerships")
-    cols = st.columns(3)
-    for i, p in enumerate(PARTNERS["prospective"]):
-        with cols[i % 3]:
-            if st.button(p["name"], key=f"pros_{p['id']}"):
-                set_route(page="Partnerships", scope="prospective", partner=p["id"], section="overview")
+    # Both scopes in one pass; navigate once after the whole grid has rendered
+    clicked = None
+    for n, (scope, title, prefix) in enumerate((("active", "Active Partnerships", "act"),
+                                                 ("prospective", "Prospective Partnerships", "pros"))):
+        if n: st.markdown("---")
+        st.subheader(title)
+        cols = st.columns(3)
+        for i, p in enumerate(PARTNERS[scope]):
+            if cols[i % 3].button(p["name"], key=f"{prefix}_{p['id']}"):
+                clicked = (scope, p["id"])
+    if clicked:
+        set_route(page="Partnerships", scope=clicked[0], partner=clicked[1])
 
 def render_prospecting():
     st.subheader("Prospecting")
@@ -793,15 +1087,23 @@ def render_selling():
 def render_reports():
     st.subheader("Reports")
     st.caption("Quick POP export (CSV + images zip)")
-    partner = st.text_input("Partner", "Acme Beverages", key="act_partner")
-    title   = st.text_input("Activation Title", "Opening Night LED", key="act_title")
-    kpi     = st.text_input("KPI (e.g., Impressions)", "1.2M", key="act_kpi")
-    media   = st.file_uploader("Upload photo/screenshot(s)", type=["png","jpg","jpeg"], accept_multiple_files=True, key="act_media")
-    notes   = st.text_area("Notes", "", key="act_notes")
-    if st.button("Export POP"):
+    _pop_export_fragment()
+
+@st.fragment
+def _pop_export_fragment():
+    """Export POP submit and the download click rerun only this block."""
+    # One form so editing the fields doesn't rerun the app; only "Export POP" submits
+    with st.form("pop_form"):
+        partner = st.text_input("Partner", "Acme Beverages", key="act_partner")
+        title   = st.text_input("Activation Title", "Opening Night LED", key="act_title")
+        kpi     = st.text_input("KPI (e.g., Impressions)", "1.2M", key="act_kpi")
+        media   = st.file_uploader("Upload photo/screenshot(s)", type=["png","jpg","jpeg"], accept_multiple_files=True, key="act_media")
+        notes   = st.text_area("Notes", "", key="act_notes")
+        export_clicked = st.form_submit_button("Export POP")
+    if export_clicked:
         # Build CSV in memory
         rows = [{"partner": partner, "title": title, "kpi": kpi, "notes": notes, "filename": m.name if media else ""} for m in (media or [None])]
-        csv_bytes = pd.DataFrame(rows).to_csv(index=False).encode("utf-8")
+        csv_bytes = _csv_bytes(rows, ["partner", "title", "kpi", "notes", "filename"])
         st.download_button("Download POP CSV", data=csv_bytes, file_name=f"POP_{slug(partner)}.csv", mime="text/csv")
         # Future: build a zip with images + CSV
 
@@ -825,6 +1127,12 @@ def render_data():
     st.subheader("Data")
     st.info("3rd-party and internal data dashboards (coming soon).")
 
+# hash_funcs: key on the compact (orjson) serialization instead of Streamlit's recursive hasher
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False, hash_funcs={dict: json_dumps})
+def _catalog_json(assets: dict) -> bytes:
+    """Pretty-printed catalog bytes; cached on the catalog content."""
+    return json_dumps(assets, indent=True)
+
 def render_settings():
     st.subheader("Settings")
     st.caption("Theme and asset catalogs.")
@@ -832,42 +1140,54 @@ def render_settings():
 
     st.markdown("#### Asset Catalogs")
     scope = st.selectbox("Scope", ["active","prospective"], index=0)
-    names = [p["name"] for p in PARTNERS[scope]]
-    ids   = [p["id"]   for p in PARTNERS[scope]]
+    names, name_to_id = _scope_partners(scope)
     if not names:
         st.info("No partners in this scope.")
         return
     pick = st.selectbox("Choose partner", names)
-    pid  = ids[names.index(pick)]
+    pid  = name_to_id[pick]
 
     # Load so we can show/download
     load_assets_for(pid)
     # Download current catalog
-    cat_json = json.dumps(st.session_state["assets"][pid], ensure_ascii=False, indent=2)
-    st.download_button("Download Catalog (JSON)", data=cat_json.encode("utf-8"),
+    st.download_button("Download Catalog (JSON)", data=_catalog_json(st.session_state["assets"][pid]),
                        file_name=f"assets_{pid}.json", mime="application/json")
     # Upload replacement
     up = st.file_uploader("Replace Catalog (JSON)", type=["json"], key=f"assets_up_{pid}")
     if up and st.button("Upload & Replace", key=f"assets_replace_{pid}"):
-        try:
-            data = json.loads(up.read().decode("utf-8"))
-            st.session_state["assets"][pid] = data
-            save_assets(pid)
-            toast("Catalog updated.", "success"); st.rerun()
-        except Exception as e:
-            st.error(f"Invalid JSON: {e}")
+        if st.session_state.get(f"assets_applied_{pid}") == up.file_id:
+            toast("Catalog already applied.")
+        else:
+            try:
+                data = json.loads(up.getvalue().decode("utf-8"))
+                st.session_state["assets"][pid] = data
+                save_assets(pid)
+                flush_pending_writes()  # starts the S3 upload on the I/O pool...
+                _catalog_json(data)     # ...while the next render's download payload is built here
+                st.session_state[f"assets_applied_{pid}"] = up.file_id
+                toast("Catalog updated.", "success"); st.rerun()
+            except Exception as e:
+                st.error(f"Invalid JSON: {e}")
 
 # ------------------------
 # Router
 # ------------------------
-if   current_page == "Me":             render_me()
-elif current_page == "Partnerships":   render_partnerships()
-elif current_page == "Prospecting":    render_prospecting()
-elif current_page == "Selling":        render_selling()
-elif current_page == "Reports":        render_reports()
-elif current_page == "Users":          render_users()
-elif current_page == "Presentations":  render_presentations()
-elif current_page == "Files":          render_files()
-elif current_page == "Contracts":      render_contracts()
-elif current_page == "Data":           render_data()
-else:                                   render_settings()
+ROUTES = {
+    "Me":            render_me,
+    "Partnerships":  render_partnerships,
+    "Prospecting":   render_prospecting,
+    "Selling":       render_selling,
+    "Reports":       render_reports,
+    "Users":         render_users,
+    "Presentations": render_presentations,
+    "Files":         render_files,
+    "Contracts":     render_contracts,
+    "Data":          render_data,
+    "Settings":      render_settings,
+}
+
+# The finally also covers runs cut short by st.rerun()/st.stop(), so each run flushes exactly once
+try:
+    ROUTES.get(current_page, render_settings)()
+finally:
+    flush_pending_writes()
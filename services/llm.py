@@ -1,8 +1,20 @@
-import os
-from typing import Dict, List
-from openai import OpenAI
+import os, json
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List
 
-def get_client() -> OpenAI:
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+@lru_cache(maxsize=1)
+def get_client() -> "OpenAI":
+    """One OpenAI client per process so its HTTP connection pool is reused across calls.
+    The SDK is imported here, so the no-key heuristic path never loads it."""
+    from openai import OpenAI
     return OpenAI()
 
 def generate_pitch_insight(prospect: Dict, team_assets: List[str]) -> Dict:
@@ -34,12 +46,7 @@ Return JSON with keys: opener, rationale, matching_assets, next_steps.
     resp = client.chat.completions.create(
         model="gpt-4o-mini",
         temperature=0.3,
+        response_format={"type": "json_object"},  # JSON mode: the reply is always a JSON object
         messages=[{"role":"user","content":prompt}]
     )
-    text = resp.choices[0].message.content
-    import json
-    try:
-        data = json.loads(text)
-    except Exception:
-        data = {"opener": text.strip(), "rationale": "", "matching_assets": [], "next_steps": []}
-    return data
+    return _json_loads(resp.choices[0].message.content)
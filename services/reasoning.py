@@ -1,3 +1,8 @@
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from typing import Dict
 from .llm import generate_pitch_insight
 
@@ -11,6 +16,15 @@ TEAM_ASSETS = [
     "Community clinic : youth engagement",
 ]
 
+# Pitch results keyed on a digest of the prospect; oldest entries drop first
+_PITCH_MEMO_MAX = 256
+_pitch_memo: "OrderedDict[str, Dict]" = OrderedDict()
+_pitch_memo_lock = threading.Lock()
+
+def _prospect_key(prospect: Dict) -> str:
+    raw = json.dumps(prospect, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
 def propose_for_prospect(prospect: Dict) -> Dict:
     """
     Calls the LLM helper to produce:
@@ -19,5 +33,18 @@ def propose_for_prospect(prospect: Dict) -> Dict:
       - matching_assets (<=5)
       - next_steps (3–5 bullets)
     Falls back to a simple heuristic if no OPENAI_API_KEY is set.
+    Results are memoized per prospect content; callers get a copy.
     """
-    return generate_pitch_insight(prospect, TEAM_ASSETS)
+    key = _prospect_key(prospect)
+    with _pitch_memo_lock:
+        hit = _pitch_memo.get(key)
+        if hit is not None:
+            _pitch_memo.move_to_end(key)
+            return copy.deepcopy(hit)
+    result = generate_pitch_insight(prospect, TEAM_ASSETS)
+    with _pitch_memo_lock:
+        _pitch_memo[key] = result
+        _pitch_memo.move_to_end(key)
+        while len(_pitch_memo) > _PITCH_MEMO_MAX:
+            _pitch_memo.popitem(last=False)
+    return copy.deepcopy(result)
@@ -1,29 +1,70 @@
 from __future__ import annotations
-import os, io, mimetypes, time
+import os, io, gzip, mimetypes, time
+import importlib.util
+from functools import lru_cache
 from typing import Optional
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
+
+# boto3/botocore are imported on first S3 use, so importing this module stays cheap when S3 is off
+
+@lru_cache(maxsize=1)
+def _have_boto3() -> bool:
+    return importlib.util.find_spec("boto3") is not None
 
 def s3_enabled() -> bool:
-    return bool(os.getenv("S3_BUCKET"))
+    return bool(os.getenv("S3_BUCKET")) and _have_boto3()
 
-def _client():
+def _s3_errors():
+    from botocore.exceptions import BotoCoreError, ClientError
+    return (BotoCoreError, ClientError)
+
+@lru_cache(maxsize=4)
+def _client_cached(region, akid, sak, tok):
+    import boto3
     return boto3.client(
         "s3",
-        region_name=os.getenv("AWS_DEFAULT_REGION") or os.getenv("AWS_REGION"),
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        aws_session_token=os.getenv("AWS_SESSION_TOKEN"),
+        region_name=region,
+        aws_access_key_id=akid,
+        aws_secret_access_key=sak,
+        aws_session_token=tok,
     )
 
+def _client():
+    """Shared client per credential set (boto3 clients are thread-safe; building one loads botocore models)."""
+    return _client_cached(
+        os.getenv("AWS_DEFAULT_REGION") or os.getenv("AWS_REGION"),
+        os.getenv("AWS_ACCESS_KEY_ID"),
+        os.getenv("AWS_SECRET_ACCESS_KEY"),
+        os.getenv("AWS_SESSION_TOKEN"),
+    )
+
+_GZIP_MIN_BYTES = 1024  # below this the gzip header outweighs the savings
+
+def _compressible(ct: str) -> bool:
+    return ct.startswith("text/") or ct in ("application/json", "application/csv")
+
 def upload_bytes(key: str, data: bytes, content_type: Optional[str] = None) -> Optional[str]:
     if not s3_enabled():
         return None
     ct = content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+    extra = {}
+    if _compressible(ct) and len(data) >= _GZIP_MIN_BYTES:
+        data, extra = gzip.compress(data, compresslevel=6), {"ContentEncoding": "gzip"}
     try:
-        _client().put_object(Bucket=os.getenv("S3_BUCKET"), Key=key, Body=data, ContentType=ct)
+        _client().put_object(Bucket=os.getenv("S3_BUCKET"), Key=key, Body=data, ContentType=ct, **extra)
         return key
-    except (BotoCoreError, ClientError) as e:
+    except _s3_errors() as e:
+        print("S3 upload error:", e)
+        return None
+
+def upload_fileobj(key: str, fileobj, content_type: Optional[str] = None) -> Optional[str]:
+    """Stream a file-like object to S3 (managed multipart for large files) without buffering it."""
+    if not s3_enabled():
+        return None
+    ct = content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+    try:
+        _client().upload_fileobj(fileobj, os.getenv("S3_BUCKET"), key, ExtraArgs={"ContentType": ct})
+        return key
+    except _s3_errors() as e:
         print("S3 upload error:", e)
         return None
 
@@ -36,6 +77,42 @@ def presigned_url(key: str, expires: int = 3600) -> Optional[str]:
             Params={"Bucket": os.getenv("S3_BUCKET"), "Key": key},
             ExpiresIn=expires
         )
-    except (BotoCoreError, ClientError) as e:
+    except _s3_errors() as e:
         print("S3 presign error:", e)
         return None
+
+def presigned_urls_batch(keys, expires: int = 3600) -> dict:
+    """{key: url or None} for many keys with one client; signing is local (no network), so a plain loop suffices."""
+    if not s3_enabled():
+        return dict.fromkeys(keys)
+    c, bucket, out = _client(), os.getenv("S3_BUCKET"), {}
+    for k in keys:
+        try:
+            out[k] = c.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": k}, ExpiresIn=expires)
+        except _s3_errors() as e:
+            print("S3 presign error:", e)
+            out[k] = None
+    return out
+
+def last_modified(key: str) -> Optional[float]:
+    """Object's LastModified as a POSIX timestamp (one HEAD request), or None if missing/unreachable."""
+    if not s3_enabled():
+        return None
+    try:
+        return _client().head_object(Bucket=os.getenv("S3_BUCKET"), Key=key)["LastModified"].timestamp()
+    except _s3_errors() as e:
+        if getattr(e, "response", {}).get("Error", {}).get("Code") not in ("404", "NoSuchKey"):
+            print("S3 head error:", e)
+        return None
+
+def download_bytes(key: str) -> Optional[bytes]:
+    if not s3_enabled():
+        return None
+    try:
+        obj = _client().get_object(Bucket=os.getenv("S3_BUCKET"), Key=key)
+        body = obj["Body"].read()
+        # boto3 doesn't undo Content-Encoding (browsers following a presigned URL do)
+        return gzip.decompress(body) if obj.get("ContentEncoding") == "gzip" else body
+    except _s3_errors() as e:
+        print("S3 download error:", e)
+        return None
@@ -1,32 +1,92 @@
 from __future__ import annotations
-import os
+import os, hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import List, Tuple
 from langchain_community.document_loaders import PyPDFLoader
+try:  # PDFium (C) extracts text several times faster than pure-Python pypdf; same Document-per-page output
+    import pypdfium2  # noqa: F401
+    from langchain_community.document_loaders import PyPDFium2Loader as _PDFLoader
+except ImportError:
+    _PDFLoader = PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from .vectorstores import build_vectorstore_from_chunks
-from .s3store import s3_enabled, upload_bytes
+from .vectorstores import EMBED_DIM, build_vectorstore_from_chunks
+from .s3store import s3_enabled, upload_fileobj
 
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
+CHROMA_CACHE_DIR = os.getenv("CHROMA_CACHE_DIR", ".chroma_cache")
+CHUNK_SIZE, CHUNK_OVERLAP = 1000, 150
+
+def _file_sig(path: str) -> str:
+    """Content digest read in 1 MiB chunks (constant memory)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+PARSE_AHEAD = 4  # PDFs parsed concurrently ahead of the splitter
+
+@lru_cache(maxsize=4)
+def _load_pdf(path: str, sig: str) -> tuple:
+    """Parsed pages for one PDF; keyed on (path, content digest) so an unchanged file re-indexed right away
+    isn't re-parsed. Kept small: each entry holds a whole document's text."""
+    return tuple(_PDFLoader(path).load())
+
+def _iter_pages(pool, paths, sigs):
+    """Pages of each PDF in input order, with up to PARSE_AHEAD parses in flight; a file's pages are handed
+    on as soon as its parse finishes and are not kept once the consumer moves past them."""
+    todo = iter(zip(paths, sigs))
+    running = deque(pool.submit(_load_pdf, p, s) for p, s in islice(todo, PARSE_AHEAD))
+    while running:
+        pages = running.popleft().result()
+        nxt = next(todo, None)
+        if nxt is not None:
+            running.append(pool.submit(_load_pdf, *nxt))
+        yield from pages
+
+def _upload_pdf(path: str) -> None:
+    """Persist the original to S3 (streamed, multipart for large files); failures only warn."""
+    try:
+        with open(path, "rb") as fh:
+            upload_fileobj(f"contracts/{Path(path).name}", fh, content_type="application/pdf")
+    except Exception as e:
+        print("S3 upload warning:", e)
+
+def _iter_chunks(docs, splitter, batch: int = 1024):
+    """Split page by page and yield chunk batches, so the full chunk list is never held at once.
+    A batch spans several embeddings requests, which the vector store sends concurrently."""
+    buf = []
+    for d in docs:
+        buf.extend(splitter.split_documents([d]))
+        while len(buf) >= batch:
+            yield buf[:batch]
+            buf = buf[batch:]
+    if buf:
+        yield buf
 
 def build_contract_store(pdf_paths: List[str], persist_dir: str | None = None):
-    docs = []
-    for p in pdf_paths:
-        if not p.lower().endswith(".pdf") or not Path(p).exists():
-            continue
-        # Optionally upload original to S3 for persistence
+    paths = [p for p in pdf_paths if p.lower().endswith(".pdf") and Path(p).exists()]
+    if not paths:
+        return None, 0, "none"
+    # Uploads are network-bound and independent of parsing, so overlap them (and file reads) across
+    # PDFs; pages still reach the splitter in the serial loop's order, one file at a time
+    with ThreadPoolExecutor(max_workers=8) as pool:
         if s3_enabled():
-            try:
-                with open(p, "rb") as fh:
-                    key = f"contracts/{Path(p).name}"
-                    upload_bytes(key, fh.read(), content_type="application/pdf")
-            except Exception as e:
-                print("S3 upload warning:", e)
-        loader = PyPDFLoader(p)
-        docs.extend(loader.load())
-    if not docs:
+            for p in paths:
+                pool.submit(_upload_pdf, p)
+        sigs = list(pool.map(_file_sig, paths))
+        # Local Chroma collections are keyed on everything that determines their vectors, so a rerun over the
+        # same PDFs reopens the on-disk index instead of re-embedding it
+        key = hashlib.blake2b(f"{EMBED_MODEL}|{EMBED_DIM}|{CHUNK_SIZE}|{CHUNK_OVERLAP}|{'|'.join(sigs)}".encode(),
+                              digest_size=8)
+        splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        retriever, n_chunks, provider = build_vectorstore_from_chunks(
+            _iter_chunks(_iter_pages(pool, paths, sigs), splitter), embed_model=EMBED_MODEL,
+            persist_directory=os.path.join(persist_dir or CHROMA_CACHE_DIR, key.hexdigest()))
+    if not n_chunks:
         return None, 0, "none"
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
-    chunks = splitter.split_documents(docs)
-    retriever, n_chunks, provider = build_vectorstore_from_chunks(chunks, embed_model=EMBED_MODEL)
     return retriever, n_chunks, provider
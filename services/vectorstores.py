@@ -1,44 +1,418 @@
 from __future__ import annotations
-import os
-from typing import List, Tuple, Optional
+import os, asyncio, hashlib, shutil, sqlite3, threading, time, uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List, Tuple, Optional
 
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma, Pinecone as LC_Pinecone, Qdrant as LC_Qdrant
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
 
-def build_vectorstore_from_chunks(chunks, embed_model: str = "text-embedding-3-small"):
+if TYPE_CHECKING:  # provider SDKs load on first use, only for the provider actually configured
+    from langchain_openai import OpenAIEmbeddings
+    from langchain_community.vectorstores import Qdrant as LC_Qdrant
+
+EMBED_CHUNK_SIZE = 256   # texts per embeddings request
+EMBED_CONCURRENCY = 8    # embeddings requests in flight at once
+# text-embedding-3 vectors truncated server-side (1536 -> 512 by default); remote indexes must be created at this size
+EMBED_DIM = int(os.getenv("EMBED_DIM", "512")) or None
+# HNSW sized for k=5 retrieval over a few thousand contract chunks (hnswlib defaults: M=16, ef_construction=100, ef=10)
+HNSW_M, HNSW_EF_CONSTRUCT, HNSW_EF_SEARCH = 32, 200, 32
+CHROMA_COLLECTION_METADATA = {"hnsw:space": "ip", "hnsw:M": HNSW_M,
+                              "hnsw:construction_ef": HNSW_EF_CONSTRUCT, "hnsw:search_ef": HNSW_EF_SEARCH}
+# Completed on-disk Chroma builds kept next to each other; older ones are evicted after a new build
+CHROMA_CACHE_KEEP = int(os.getenv("CHROMA_CACHE_KEEP", "8"))
+CHROMA_TMP_TTL = 24 * 3600  # seconds before an abandoned .tmp- build directory is swept
+
+# EMBED_F16=1 stores the disk embedding cache's vectors in half precision
+VEC_DTYPE = np.float16 if os.getenv("EMBED_F16") == "1" else np.float32
+
+HTTP_LIMITS = {"max_connections": 64, "max_keepalive_connections": 64}
+
+@lru_cache(maxsize=1)
+def _http2() -> bool:
+    """HTTP/2 (one multiplexed connection for concurrent requests) needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+@lru_cache(maxsize=1)
+def _http_client():
+    """Keep-alive pool shared by query embeddings; the TLS handshake is done up front on a daemon thread."""
+    import httpx
+    client = httpx.Client(limits=httpx.Limits(**HTTP_LIMITS), http2=_http2(), timeout=60)
+    def warm():
+        try:
+            client.head(os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"))
+        except Exception:
+            pass
+    threading.Thread(target=warm, daemon=True).start()
+    return client
+
+def _dimensions(model: str) -> Optional[int]:
+    """Only the text-embedding-3 family accepts a dimensions parameter."""
+    return EMBED_DIM if model.startswith("text-embedding-3") else None
+
+async def _embed_chunks_async(texts: List[str], model: str, chunk_size: int, concurrency: int) -> List[List[float]]:
+    import httpx
+    from openai import AsyncOpenAI, RateLimitError
+    from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+    sem = asyncio.Semaphore(concurrency)
+    extra = {"dimensions": _dimensions(model)} if _dimensions(model) else {}
+    http = httpx.AsyncClient(limits=httpx.Limits(**HTTP_LIMITS), http2=_http2(), timeout=60)
+    async with AsyncOpenAI(http_client=http) as client:
+        @retry(retry=retry_if_exception_type(RateLimitError), wait=wait_random_exponential(min=1, max=30),
+               stop=stop_after_attempt(6), reraise=True)
+        async def one(batch):
+            async with sem:
+                resp = await client.embeddings.create(input=batch, model=model, **extra)
+                return [d.embedding for d in resp.data]
+        parts = await asyncio.gather(*(one(texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)))
+    return [v for part in parts for v in part]
+
+class _EmbeddingCache:
+    """Content-addressed vectors on local disk (sqlite, VEC_DTYPE blobs), keyed on model, dimensions and the
+    text digest, so re-indexing the same chunks skips the API whichever vector store is in use.
+    Holds one connection (guarded by a lock) and keeps at most max_rows vectors, dropping the oldest writes."""
+    def __init__(self, path: str, max_rows: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS emb (k BLOB PRIMARY KEY, v BLOB NOT NULL)")
+
+    def get_many(self, keys: List[bytes]) -> dict:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._db.execute(f"SELECT k, v FROM emb WHERE k IN ({','.join('?' * len(part))})", part)
+                found.update((bytes(k), np.frombuffer(v, dtype=VEC_DTYPE).astype(np.float32).tolist()) for k, v in rows)
+        return found
+
+    def put_many(self, items) -> None:
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO emb VALUES (?, ?)",
+                                 ((k, np.asarray(v, dtype=VEC_DTYPE).tobytes()) for k, v in items))
+            # REPLACE assigns a fresh rowid, so the lowest rowids are the oldest writes
+            self._db.execute("DELETE FROM emb WHERE rowid IN (SELECT rowid FROM emb ORDER BY rowid "
+                             "LIMIT max(0, (SELECT count(*) FROM emb) - ?))", (self.max_rows,))
+
+@lru_cache(maxsize=1)
+def _embedding_cache() -> Optional[_EmbeddingCache]:
+    """Opt-in (EMBED_DISK_CACHE=1); EMBED_CACHE_PATH / EMBED_CACHE_MAX_ROWS set location and bound."""
+    if os.getenv("EMBED_DISK_CACHE") != "1":
+        return None
+    return _EmbeddingCache(os.getenv("EMBED_CACHE_PATH") or ".embed_cache/embeddings.sqlite3",
+                           int(os.getenv("EMBED_CACHE_MAX_ROWS", "200000")))
+
+def _unit_rows(vecs: List[List[float]]) -> List[List[float]]:
+    m = np.asarray(vecs, dtype=np.float32)
+    m /= np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+    return m.tolist()
+
+class _BatchedEmbeddings(Embeddings):
+    """Document embeddings fetched as concurrent chunked requests instead of one serial request at a time;
+    queries go to the wrapped LangChain model. All vectors come back L2-normalized, so indexes use
+    inner-product distance."""
+    def __init__(self, inner: OpenAIEmbeddings, model: str, chunk_size: int = EMBED_CHUNK_SIZE,
+                 concurrency: int = EMBED_CONCURRENCY):
+        self.inner, self.model, self.chunk_size, self.concurrency = inner, model, chunk_size, concurrency
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        if not texts:
+            return []
+        # Templated contracts repeat boilerplate: embed each distinct text once and fan the vectors back out
+        seen: dict = {}
+        unique, idx = [], []
+        for t in texts:
+            h = hashlib.blake2b(t.encode(), digest_size=16).digest()
+            if h not in seen:
+                seen[h] = len(unique)
+                unique.append(t)
+            idx.append(seen[h])
+        vecs = self._embed_cached(list(seen), unique)
+        return vecs if len(unique) == len(texts) else [vecs[i] for i in idx]
+
+    def _embed_cached(self, digests: List[bytes], texts: List[str]) -> List[List[float]]:
+        cache = _embedding_cache()
+        if cache is None:
+            return _unit_rows(self._embed_unique(texts))
+        prefix = f"{self.model}|{_dimensions(self.model)}|{np.dtype(VEC_DTYPE).name}|".encode()
+        keys = [prefix + d for d in digests]
+        found = cache.get_many(keys)
+        todo = [i for i, k in enumerate(keys) if k not in found]
+        if todo:
+            fresh = _unit_rows(self._embed_unique([texts[i] for i in todo]))
+            cache.put_many((keys[i], v) for i, v in zip(todo, fresh))
+            found.update((keys[i], v) for i, v in zip(todo, fresh))
+        return [found[k] for k in keys]
+
+    def _embed_unique(self, texts: List[str]) -> List[List[float]]:
+        job = _embed_chunks_async(texts, self.model, self.chunk_size, self.concurrency)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(job)
+        # Called from inside a running event loop: drive ours on a worker thread instead
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, job).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return _unit_rows([self.inner.embed_query(text)])[0]
+
+class _QueryCache:
+    """LRU + TTL map from normalized query text to the documents retrieved for it."""
+    def __init__(self, max_size: int = 2000, ttl: float = 300.0):
+        self.max_size, self.ttl = max_size, ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, docs)
+
+    @staticmethod
+    def key(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def get(self, key: str):
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None or e[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return e[1]
+
+    def put(self, key: str, docs: List[Document]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, docs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+class CachedRetriever(BaseRetriever):
+    """Retriever that answers repeated queries from a _QueryCache; a miss embeds the query once and
+    searches the store by that vector."""
+    store: Any
+    embeddings: Any
+    cache: Any
+    search_kwargs: dict = {"k": 5}
+    search_type: str = "similarity"  # or "mmr": fetch_k candidates, re-ranked for diversity (lambda_mult)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        key = self.cache.key(query)
+        docs = self.cache.get(key)
+        if docs is None:
+            search = (self.store.max_marginal_relevance_search_by_vector if self.search_type == "mmr"
+                      else self.store.similarity_search_by_vector)
+            docs = search(self.embeddings.embed_query(query), **self.search_kwargs)
+            self.cache.put(key, docs)
+        return list(docs)
+
+def _retriever(vectordb, embeddings, **search_kwargs) -> Optional[CachedRetriever]:
+    if vectordb is None:
+        return None
+    return CachedRetriever(store=vectordb, embeddings=embeddings, cache=_QueryCache(), search_type="mmr",
+                           search_kwargs={"k": 5, "fetch_k": 30, "lambda_mult": 0.5, **search_kwargs})
+
+# Process-wide clients: built once per configuration, reused by every indexing call
+@lru_cache(maxsize=4)
+def _get_embeddings(model: str, chunk_size: int, concurrency: int) -> _BatchedEmbeddings:
+    from langchain_openai import OpenAIEmbeddings
+    return _BatchedEmbeddings(OpenAIEmbeddings(model=model, dimensions=_dimensions(model), http_client=_http_client(),
+                                               max_retries=3), model, chunk_size, concurrency)
+
+@lru_cache(maxsize=4)
+def _init_pinecone(api_key: str, env: str) -> None:
+    import pinecone
+    pinecone.init(api_key=api_key, environment=env)
+
+@lru_cache(maxsize=4)
+def _get_qdrant_client(url: str, api_key: Optional[str]):
+    from qdrant_client import QdrantClient
+    return QdrantClient(url=url, api_key=api_key, prefer_grpc=True,
+                        grpc_options={"grpc.max_send_message_length": 64 << 20})
+
+def _qdrant_store(client, collection: str, embeddings: Embeddings, dim: Optional[int] = None) -> LC_Qdrant:
+    """LangChain wrapper over the shared client; creates the collection on first use, sized dim
+    (probed with one query embedding only when the model's size isn't known up front)."""
+    from langchain_community.vectorstores import Qdrant as LC_Qdrant
+    from qdrant_client.http.models import Distance, HnswConfigDiff, VectorParams
+    try:
+        client.get_collection(collection)
+    except Exception:
+        dim = dim or len(embeddings.embed_query("dimension probe"))
+        client.create_collection(collection, vectors_config=VectorParams(size=dim, distance=Distance.DOT),
+                                 hnsw_config=HnswConfigDiff(m=HNSW_M, ef_construct=HNSW_EF_CONSTRUCT))
+    return LC_Qdrant(client=client, collection_name=collection, embeddings=embeddings)
+
+def _qdrant_upload(client, collection: str, embeddings: Embeddings, batches, parallel: int = 1) -> int:
+    """Embed each batch in one concurrent call, then bulk-load it with upload_collection (256 points per
+    request) using LC_Qdrant's payload layout; returns the number of points written."""
+    n = 0
+    for batch in batches:
+        if not batch:
+            continue
+        texts = [d.page_content for d in batch]
+        client.upload_collection(
+            collection_name=collection, vectors=embeddings.embed_documents(texts),
+            payload=[{"page_content": t, "metadata": d.metadata} for t, d in zip(texts, batch)],
+            ids=[str(uuid.uuid4()) for _ in batch], batch_size=256, parallel=parallel)
+        n += len(batch)
+    return n
+
+def _pinecone_upload(index, embeddings: Embeddings, batches, text_key: str = "text", upsert_size: int = 64) -> int:
+    """Stream chunk batches into Pinecone: each batch's upserts go out as async_req futures and are only
+    awaited after the next batch has been embedded, so embedding and upserting overlap while at most two
+    batches of vectors are held; returns the number of vectors written."""
+    n, pending = 0, []
+    for batch in batches:
+        if not batch:
+            continue
+        texts = [d.page_content for d in batch]
+        vecs = embeddings.embed_documents(texts)
+        for f in pending:
+            f.get()
+        rows = [(str(uuid.uuid4()), v, {**d.metadata, text_key: t}) for t, v, d in zip(texts, vecs, batch)]
+        pending = [index.upsert(vectors=rows[i:i + upsert_size], async_req=True)
+                   for i in range(0, len(rows), upsert_size)]
+        n += len(rows)
+    for f in pending:
+        f.get()
+    return n
+
+def _fill(create, chunks):
+    """Build a store from the first batch via create(batch), then add_documents(batch) the rest.
+    chunks is a flat list of Documents or an iterable of Document batches; returns (store, n)."""
+    batches = [chunks] if isinstance(chunks, list) else chunks
+    vectordb, n = None, 0
+    for batch in batches:
+        if not batch:
+            continue
+        if vectordb is None:
+            vectordb = create(batch)
+        else:
+            vectordb.add_documents(batch)
+        n += len(batch)
+    return vectordb, n
+
+def _evict_chroma_builds(root: str, keep: int) -> None:
+    """Keep the `keep` most recently used completed builds under root (a build is a directory holding a
+    .complete marker; reuse touches it), and sweep .tmp- directories left by crashed builds."""
+    now = time.time()
+    builds = []
+    for entry in os.scandir(root):
+        if not entry.is_dir():
+            continue
+        if ".tmp-" in entry.name:
+            if now - entry.stat().st_mtime > CHROMA_TMP_TTL:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            continue
+        try:
+            builds.append((os.stat(os.path.join(entry.path, ".complete")).st_mtime, entry.path))
+        except OSError:
+            continue  # not one of ours
+    for _, path in sorted(builds, reverse=True)[max(keep, 1):]:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _chroma(chunks, embeddings, label: str = "chroma", persist_directory: Optional[str] = None):
+    """In-memory Chroma, or an on-disk collection under persist_directory (named by its last path component)
+    that is reopened instead of re-embedded once a build has completed; chunks are then never consumed.
+    A build is written to a private temp directory and renamed into place, so concurrent builders never
+    see or delete each other's partial work; the first rename wins."""
+    from langchain_community.vectorstores import Chroma
+    if not persist_directory:
+        vectordb, n = _fill(lambda b: Chroma.from_documents(b, embeddings, persist_directory=None,
+                                                            collection_metadata=CHROMA_COLLECTION_METADATA), chunks)
+        return _retriever(vectordb, embeddings), n, label
+    persist_directory = os.path.normpath(persist_directory)
+    name = os.path.basename(persist_directory)
+
+    def reopen():
+        done = os.path.join(persist_directory, ".complete")  # holds the chunk count
+        with open(done) as fh:
+            n = int(fh.read() or 0)
+        os.utime(done)  # recency for eviction
+        vectordb = Chroma(collection_name=name, persist_directory=persist_directory, embedding_function=embeddings)
+        return _retriever(vectordb, embeddings), n, label
+
+    try:
+        return reopen()
+    except FileNotFoundError:
+        pass
+    root = os.path.dirname(persist_directory) or "."
+    os.makedirs(root, exist_ok=True)
+    tmp = f"{persist_directory}.tmp-{uuid.uuid4().hex}"
+    try:
+        vectordb, n = _fill(lambda b: Chroma.from_documents(b, embeddings, collection_name=name,
+                                                            persist_directory=tmp,
+                                                            collection_metadata=CHROMA_COLLECTION_METADATA), chunks)
+        if vectordb is None:
+            return None, n, label
+        with open(os.path.join(tmp, ".complete"), "w") as fh:
+            fh.write(str(n))
+        try:
+            os.rename(tmp, persist_directory)
+        except OSError:  # target exists: another process finished the same build first, or a stale partial
+            if not os.path.isfile(os.path.join(persist_directory, ".complete")):
+                shutil.rmtree(persist_directory, ignore_errors=True)
+                os.rename(tmp, persist_directory)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    _evict_chroma_builds(root, CHROMA_CACHE_KEEP)
+    return reopen()
+
+def build_vectorstore_from_chunks(chunks, embed_model: str = "text-embedding-3-small",
+                                  embeddings_chunk_size: int = EMBED_CHUNK_SIZE, concurrency: int = EMBED_CONCURRENCY,
+                                  persist_directory: Optional[str] = None):
     """Return (retriever, n_chunks, provider_used).
     Provider is selected via VECTOR_DB_PROVIDER env: 'pinecone' | 'qdrant' | 'chroma' (default).
+    chunks may be a list of Documents or an iterable of batches (indexed incrementally).
+    Each batch is embedded as concurrent requests of embeddings_chunk_size texts.
+    persist_directory (Chroma only) should be unique to the chunk content; a completed build there is reused.
     """
     provider = (os.getenv("VECTOR_DB_PROVIDER") or "pinecone").lower()
-    embeddings = OpenAIEmbeddings(model=embed_model)
+    embeddings = _get_embeddings(embed_model, embeddings_chunk_size, concurrency)
 
     if provider == "pinecone":
-        # Requires: pinecone-client, PINECONE_API_KEY, PINECONE_ENV, PINECONE_INDEX
-        import pinecone
+        # Requires: pinecone-client, PINECONE_API_KEY, PINECONE_ENV, PINECONE_INDEX (metric="dotproduct")
         api_key = os.getenv("PINECONE_API_KEY")
         env = os.getenv("PINECONE_ENV")
         index_name = os.getenv("PINECONE_INDEX", "sports_ai")
         if not api_key or not env:
             # fallback to chroma if not configured
-            vectordb = Chroma.from_documents(chunks, embeddings, persist_directory=None)
-            return vectordb.as_retriever(search_kwargs={"k": 5}), len(chunks), "chroma (fallback)"
-        pinecone.init(api_key=api_key, environment=env)
-        vectordb = LC_Pinecone.from_documents(chunks, embeddings, index_name=index_name)
-        return vectordb.as_retriever(search_kwargs={"k": 5}), len(chunks), "pinecone"
+            return _chroma(chunks, embeddings, "chroma (fallback)", persist_directory)
+        import pinecone
+        from langchain_community.vectorstores import Pinecone as LC_Pinecone
+        from langchain_community.vectorstores.utils import DistanceStrategy
+        _init_pinecone(api_key, env)
+        # Upserts fan out over PINECONE_POOL_THREADS in 64-vector requests; the whole batch goes to
+        # embed_documents in one call so _BatchedEmbeddings can run its requests concurrently
+        index = pinecone.Index(index_name, pool_threads=int(os.getenv("PINECONE_POOL_THREADS", "30")))
+        n = _pinecone_upload(index, embeddings, [chunks] if isinstance(chunks, list) else chunks)
+        vectordb = LC_Pinecone(index, embeddings, "text", distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT)
+        return _retriever(vectordb if n else None, embeddings), n, "pinecone"
 
     if provider == "qdrant":
         # Requires: qdrant-client, QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION
-        from qdrant_client import QdrantClient
         url = os.getenv("QDRANT_URL")
         api_key = os.getenv("QDRANT_API_KEY")
         collection = os.getenv("QDRANT_COLLECTION", "sports_ai")
         if not url:
-            vectordb = Chroma.from_documents(chunks, embeddings, persist_directory=None)
-            return vectordb.as_retriever(search_kwargs={"k": 5}), len(chunks), "chroma (fallback)"
-        client = QdrantClient(url=url, api_key=api_key)
-        vectordb = LC_Qdrant.from_documents(chunks, embeddings, client=client, collection_name=collection)
-        return vectordb.as_retriever(search_kwargs={"k": 5}), len(chunks), "qdrant"
-
-    # default chroma (in-memory by default)
-    vectordb = Chroma.from_documents(chunks, embeddings, persist_directory=None)
-    return vectordb.as_retriever(search_kwargs={"k": 5}), len(chunks), "chroma"
+            return _chroma(chunks, embeddings, "chroma (fallback)", persist_directory)
+        client = _get_qdrant_client(url, api_key)
+        store = _qdrant_store(client, collection, embeddings, _dimensions(embed_model))
+        # QDRANT_UPLOAD_PARALLEL > 1 forks upload workers; off by default since gRPC channels don't survive fork
+        n = _qdrant_upload(client, collection, embeddings, [chunks] if isinstance(chunks, list) else chunks,
+                           parallel=int(os.getenv("QDRANT_UPLOAD_PARALLEL", "1")))
+        from qdrant_client.http.models import SearchParams
+        return _retriever(store if n else None, embeddings, search_params=SearchParams(hnsw_ef=HNSW_EF_SEARCH)), n, "qdrant"
+
+    # default chroma (in-memory unless persist_directory is given)
+    return _chroma(chunks, embeddings, persist_directory=persist_directory)
@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from services import vectorstores as vs
+
+
+def _cache(tmp_path, max_rows=100):
+    return vs._EmbeddingCache(str(tmp_path / "emb.sqlite3"), max_rows)
+
+
+# ---- _EmbeddingCache
+
+def test_cache_evicts_oldest_writes_at_max_rows(tmp_path):
+    cache = _cache(tmp_path, max_rows=3)
+    cache.put_many((bytes([i]), [float(i), 0.0]) for i in range(5))
+    found = cache.get_many([bytes([i]) for i in range(5)])
+    assert sorted(found) == [bytes([2]), bytes([3]), bytes([4])]
+
+
+def test_cache_rewrite_counts_as_newest(tmp_path):
+    cache = _cache(tmp_path, max_rows=2)
+    cache.put_many([(b"a", [1.0]), (b"b", [2.0])])
+    cache.put_many([(b"a", [1.0])])
+    cache.put_many([(b"c", [3.0])])
+    assert sorted(cache.get_many([b"a", b"b", b"c"])) == [b"a", b"c"]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_cache_blob_round_trip(tmp_path, monkeypatch, dtype):
+    monkeypatch.setattr(vs, "VEC_DTYPE", getattr(np, dtype))
+    cache = _cache(tmp_path)
+    vec = vs._unit_rows([[0.1, -0.7, 0.3, 0.5]])[0]
+    cache.put_many([(b"k", vec)])
+    got = cache.get_many([b"k"])[b"k"]
+    assert isinstance(got[0], float)  # upcast to float32 before leaving the cache
+    tol = 1e-7 if dtype == "float32" else 1e-3
+    assert np.allclose(got, vec, atol=tol)
+
+
+# ---- _BatchedEmbeddings
+
+class _Recorder(vs._BatchedEmbeddings):
+    """Embeds text t as [len(t), 1] (before normalization) and records each API batch."""
+    def __init__(self):
+        super().__init__(inner=None, model="text-embedding-3-small")
+        self.calls = []
+
+    def _embed_unique(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_embed_documents_dedupes_and_keeps_order(monkeypatch):
+    monkeypatch.setattr(vs, "_embedding_cache", lambda: None)
+    emb = _Recorder()
+    texts = ["aa", "b", "aa", "cccc", "b"]
+    out = emb.embed_documents(texts)
+    assert emb.calls == [["aa", "b", "cccc"]]  # each distinct text once, in first-seen order
+    assert out == vs._unit_rows([[float(len(t)), 1.0] for t in texts])
+
+
+def test_embed_documents_reuses_disk_cache(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    monkeypatch.setattr(vs, "_embedding_cache", lambda: cache)
+    emb = _Recorder()
+    first = emb.embed_documents(["x", "yy"])
+    second = emb.embed_documents(["yy", "zzz", "x"])
+    assert emb.calls == [["x", "yy"], ["zzz"]]
+    assert second[0] == first[1] and second[2] == first[0]
+
+
+# ---- _QueryCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(vs.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_query_cache_normalizes_keys():
+    assert vs._QueryCache.key("  Renewal   TERMS\n") == vs._QueryCache.key("renewal terms")
+
+
+def test_query_cache_expires_after_ttl(clock):
+    qc = vs._QueryCache(max_size=10, ttl=300)
+    qc.put("q", ["doc"])
+    clock[0] += 299
+    assert qc.get("q") == ["doc"]
+    clock[0] += 2
+    assert qc.get("q") is None
+    assert "q" not in qc._entries
+
+
+def test_query_cache_evicts_least_recently_used(clock):
+    qc = vs._QueryCache(max_size=2, ttl=300)
+    qc.put("a", [1])
+    qc.put("b", [2])
+    assert qc.get("a") == [1]  # "b" is now the least recently used
+    qc.put("c", [3])
+    assert qc.get("b") is None
+    assert qc.get("a") == [1] and qc.get("c") == [3]